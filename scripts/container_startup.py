@@ -10,6 +10,10 @@ This script runs during container initialization to:
 4. Detect the real host IP address for external client access.
 5. Set up appropriate environment variables based on detected IP.
 6. Generate client configurations with correct IP addresses.
+
+Client configuration generation (step 6) runs in a detached background process
+so the MCP servers can start right away; files in config/client_configs/ may
+appear shortly after initialization reports completion.
 """
 
 import os
@@ -17,11 +21,38 @@ import socket
 import sys
 import json
 from pathlib import Path
-import subprocess
 import time
 import logging
 import stat
-import shutil
+import contextlib
+import functools
+import hashlib
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:  # orjson is optional; the stdlib parser also accepts bytes
+    json_loads = json.loads
+
+# Structure required of mcp_servers.json
+MCP_CONFIG_SCHEMA = {
+    "type": "object",
+    "required": ["servers"],
+    "properties": {
+        "servers": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "enabled": {"type": "boolean"},
+                },
+            },
+        },
+    },
+}
 
 # Configure logging
 logging.basicConfig(
@@ -38,59 +69,127 @@ PIDS_DIR = APP_DIR / 'pids'
 MCP_DATA_DIR = APP_DIR / 'mcp-data'
 MCP_SERVERS_DIR = APP_DIR / 'mcp-servers'
 CLIENT_CONFIGS_DIR = CONFIG_DIR / 'client_configs'
+# Files the client config generator always (re)writes; generation is skipped only if they are all present
+LATEST_CLIENT_CONFIGS = tuple(CLIENT_CONFIGS_DIR / f"mcp_{client}_latest.json"
+                              for client in ('cline', 'roo_code', 'cherry_studio', 'github_copilot'))
+# Fingerprint (config contents + host IP) of the inputs behind the current client configurations
+GENERATOR_FINGERPRINT_FILE = CONFIG_DIR / '.gen_fingerprint'
+ESSENTIAL_DIRS = (CONFIG_DIR, LOGS_DIR, PIDS_DIR, CLIENT_CONFIGS_DIR, MCP_DATA_DIR, MCP_SERVERS_DIR)
+
+# Directories already verified by ensure_directory() in this process, with the monotonic time of the check
+VERIFIED_DIRS_TTL = 30.0
+_verified_dirs = {}
+
+# Startup steps are mostly independent file system / network probes, so they run on a small thread pool
+STARTUP_MAX_WORKERS = 8
 
 CONFIG_FILE = CONFIG_DIR / 'mcp_servers.json'
 EXAMPLE_CONFIG_FILE = CONFIG_DIR / 'mcp_servers.example.json'
+# Records the mtime/size of the last configuration that passed validation (survives container restarts)
+CONFIG_VALIDATED_MARKER = Path('/tmp/mcp_servers.validated')
+# Configuration parsed by check_mcp_config(), handed to the client config generator so it need not re-read the file
+_parsed_config = None
 
 SCRIPTS_DIR = APP_DIR / 'scripts'
-HOST_DETECTOR_SCRIPT = SCRIPTS_DIR / 'detect_host_ip.py'
+# Sibling scripts (detect_host_ip, ...) are imported directly instead of run as subprocesses
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+try:
+    from integrate_config_generator import generate_all_configs
+except Exception as e:  # Startup must go on; step 6 reports the missing generator
+    logger.warning("Client config generator unavailable: %s", e)
+    generate_all_configs = None
+
+# Shell-sourceable copy of the detected host environment (plain string, only used with os.open)
+ENV_FILE = '/tmp/mcp_environment'
 
 # --- Helper Functions ---
 
 def ensure_directory(dir_path: Path):
     """Ensure directory exists and is writable by the current user."""
+    key = os.fspath(dir_path)
+    checked_at = _verified_dirs.get(key)
+    if checked_at is not None and time.monotonic() - checked_at < VERIFIED_DIRS_TTL:
+        return True
+
     try:
-        if not dir_path.exists():
-            logger.info(f"Creating directory: {dir_path}")
+        # A single stat answers both "does it exist" and, usually, "is it writable"
+        try:
+            st = os.stat(dir_path)
+            logger.debug("Directory already exists: %s", dir_path)
+        except FileNotFoundError:
+            logger.info("Creating directory: %s", dir_path)
             # Create directory with default permissions (should be usable by user mcp)
-            dir_path.mkdir(parents=True, exist_ok=True)
-        else:
-            logger.debug(f"Directory already exists: {dir_path}")
+            os.makedirs(dir_path, exist_ok=True)
+            st = os.stat(dir_path)
 
-        # Check writability for the current user
-        if not os.access(dir_path, os.W_OK):
-            logger.error(f"FATAL: Directory {dir_path} is not writable by user {os.geteuid()}. Check volume permissions on the host.")
-            # Attempting chmod might fail if it's a volume mount issue
-            try:
-                current_mode = dir_path.stat().st_mode
-                # Add write permission for the owner (user mcp)
-                os.chmod(dir_path, current_mode | stat.S_IWUSR)
-                if os.access(dir_path, os.W_OK):
-                    logger.info(f"Added write permission for user to {dir_path}.")
-                else:
-                     # This is likely a host volume permission issue
-                     return False
-            except Exception as e:
-                logger.error(f"Error attempting to fix permissions for {dir_path}: {e}")
-                return False
-        return True
+        # Check writability for the current user; os.access also catches read-only mounts (EROFS),
+        # which the mode bits in the stat result do not show
+        if os.access(dir_path, os.W_OK):
+            _verified_dirs[key] = time.monotonic()
+            return True
+
+        logger.error("FATAL: Directory %s is not writable by user %s. Check volume permissions on the host.", dir_path, os.geteuid())
+        # Attempting chmod might fail if it's a volume mount issue
+        try:
+            # Add write permission for the owner (user mcp)
+            os.chmod(dir_path, st.st_mode | stat.S_IWUSR)
+            if os.access(dir_path, os.W_OK):
+                logger.info("Added write permission for user to %s.", dir_path)
+                _verified_dirs[key] = time.monotonic()
+                return True
+            # This is likely a host volume permission issue
+            return False
+        except Exception as e:
+            logger.error("Error attempting to fix permissions for %s: %s", dir_path, e)
+            return False
 
     except Exception as e:
-        logger.error(f"Failed to ensure directory {dir_path}: {e}")
+        logger.error("Failed to ensure directory %s: %s", dir_path, e)
         return False
 
+def index_executables(names):
+    """Map each wanted executable name to its first match on PATH, scanning every PATH directory once."""
+    suffixes = ['']
+    if os.name == 'nt':
+        suffixes += [ext.lower() for ext in os.environ.get('PATHEXT', '').split(os.pathsep) if ext]
+    # File name on disk -> tool name (e.g. 'npm.cmd' -> 'npm' on Windows)
+    candidates = {(name + suffix).lower() if os.name == 'nt' else name + suffix: name
+                  for name in names for suffix in suffixes}
+
+    wanted = len(set(names))
+    found = {}
+    for directory in os.environ.get('PATH', os.defpath).split(os.pathsep):
+        if len(found) == wanted:
+            break # Every tool located; the remaining PATH entries need not be listed
+        if not directory:
+            continue
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    tool = candidates.get(entry.name.lower() if os.name == 'nt' else entry.name)
+                    if tool is None or tool in found:
+                        continue
+                    if entry.is_file() and os.access(entry.path, os.X_OK):
+                        found[tool] = entry.path
+        except OSError:
+            continue # Missing or unreadable PATH entry
+    return found
+
 def check_essential_tools():
     """Verify that essential command-line tools (expected in PATH) are available."""
     # Tools expected to be installed in the Docker image for user 'mcp'
     tools = ["python", "node", "npm", "npx", "git", "uv", "pipx", "mcp-proxy"]
     all_found = True
     logger.info("Checking for essential tools in PATH...")
+    tool_paths = index_executables(tools)
     for tool in tools:
-        tool_path = shutil.which(tool)
+        tool_path = tool_paths.get(tool)
         if tool_path:
-            logger.info(f"  [OK] Found: {tool} at {tool_path}")
+            logger.info("  [OK] Found: %s at %s", tool, tool_path)
         else:
-            logger.error(f"  [MISSING] Tool not found in PATH: {tool}")
+            logger.error("  [MISSING] Tool not found in PATH: %s", tool)
             all_found = False
 
     if not all_found:
@@ -99,89 +198,156 @@ def check_essential_tools():
          # sys.exit(1)
     return all_found
 
+@functools.lru_cache(maxsize=1)
+def get_config_validator():
+    """Compile the configuration schema on first use; None if fastjsonschema is not installed."""
+    # Imported and compiled lazily: an unchanged configuration is never parsed, so most starts skip this cost
+    try:
+        import fastjsonschema
+    except ImportError:  # Fall back to the hand-written structure checks
+        return None
+    return fastjsonschema.compile(MCP_CONFIG_SCHEMA)
+
+def config_fingerprint(config_file: Path):
+    """Return a cheap fingerprint (mtime and size) of a configuration file, or None if it cannot be read."""
+    try:
+        st = config_file.stat()
+    except OSError:
+        return None
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+def read_validated_marker():
+    """Return the fingerprint of the last successfully validated configuration, if any."""
+    try:
+        return CONFIG_VALIDATED_MARKER.read_text(encoding='utf-8').strip()
+    except OSError:
+        return None
+
+def write_validated_marker(fingerprint):
+    """Atomically record the fingerprint of a configuration that passed validation."""
+    tmp_marker = CONFIG_VALIDATED_MARKER.with_name(CONFIG_VALIDATED_MARKER.name + '.tmp')
+    try:
+        tmp_marker.write_text(fingerprint, encoding='utf-8')
+        os.replace(tmp_marker, CONFIG_VALIDATED_MARKER)
+    except OSError as e:
+        logger.debug("Could not write validation marker %s: %s", CONFIG_VALIDATED_MARKER, e)
+
 def check_mcp_config():
     """Check if MCP server configuration file exists and is valid JSON."""
-    logger.info(f"Checking MCP configuration file: {CONFIG_FILE}...")
+    global _parsed_config
+    logger.info("Checking MCP configuration file: %s...", CONFIG_FILE)
     if not CONFIG_FILE.exists():
-        logger.warning(f"Configuration file not found.")
+        logger.warning("Configuration file not found.")
         if EXAMPLE_CONFIG_FILE.exists():
             try:
-                logger.info(f"Copying example configuration from {EXAMPLE_CONFIG_FILE} to {CONFIG_FILE}")
-                shutil.copy(EXAMPLE_CONFIG_FILE, CONFIG_FILE)
+                logger.info("Copying example configuration from %s to %s", EXAMPLE_CONFIG_FILE, CONFIG_FILE)
+                # copyfile copies in-kernel (sendfile) on Linux and skips copying permission bits.
+                # No hard link: edits to the live config must never touch the example file.
+                import shutil  # Only needed on first start
+                shutil.copyfile(EXAMPLE_CONFIG_FILE, CONFIG_FILE)
                 logger.info("Example configuration copied. Please review and customize it as needed.")
                 # Re-check existence after copy
                 if not CONFIG_FILE.exists():
                      logger.error("Failed to create config file from example.")
                      return False
             except Exception as e:
-                logger.error(f"Failed to copy example configuration: {e}")
+                logger.error("Failed to copy example configuration: %s", e)
                 return False
         else:
-             logger.error(f"No configuration file found at {CONFIG_FILE}, and no example file available at {EXAMPLE_CONFIG_FILE}.")
+             logger.error("No configuration file found at %s, and no example file available at %s.", CONFIG_FILE, EXAMPLE_CONFIG_FILE)
              return False
 
+    # Skip re-parsing if the file has not changed since it was last validated
+    fingerprint = config_fingerprint(CONFIG_FILE)
+    if fingerprint and fingerprint == read_validated_marker():
+        logger.info("MCP configuration file %s is unchanged since last validation.", CONFIG_FILE)
+        return True
+
     # Now check the content of the config file (whether copied or pre-existing)
     try:
-        with CONFIG_FILE.open('r', encoding='utf-8') as f:
-            config = json.load(f)
+        # Parse straight from bytes to skip the text-mode decoding layer
+        config = json_loads(CONFIG_FILE.read_bytes())
 
         # Basic structure validation
-        if not isinstance(config, dict) or 'servers' not in config:
-            logger.error(f"Invalid format in {CONFIG_FILE}: Must be a JSON object with a 'servers' key (list).")
-            return False
-        if not isinstance(config['servers'], list):
-            logger.error(f"Invalid format in {CONFIG_FILE}: 'servers' key must be a JSON list.")
-            return False
+        validate_mcp_config = get_config_validator()
+        if validate_mcp_config is not None:
+            from fastjsonschema import JsonSchemaValueException
+            try:
+                validate_mcp_config(config)
+            except JsonSchemaValueException as e:
+                logger.error("Invalid format in %s: %s", CONFIG_FILE, e.message)
+                return False
+        else:
+            if not isinstance(config, dict) or 'servers' not in config:
+                logger.error("Invalid format in %s: Must be a JSON object with a 'servers' key (list).", CONFIG_FILE)
+                return False
+            if not isinstance(config['servers'], list):
+                logger.error("Invalid format in %s: 'servers' key must be a JSON list.", CONFIG_FILE)
+                return False
 
         # Check if there are any enabled servers
         enabled_servers = [s for s in config.get('servers', []) if s.get('enabled', True)]
         if not enabled_servers:
-            logger.warning(f"No enabled MCP servers found in configuration: {CONFIG_FILE}")
+            logger.warning("No enabled MCP servers found in configuration: %s", CONFIG_FILE)
         else:
-            logger.info(f"Found {len(enabled_servers)} enabled MCP servers in configuration.")
+            logger.info("Found %d enabled MCP servers in configuration.", len(enabled_servers))
 
-        logger.info(f"MCP configuration file {CONFIG_FILE} is valid.")
+        logger.info("MCP configuration file %s is valid.", CONFIG_FILE)
+        _parsed_config = config
+        if fingerprint:
+            write_validated_marker(fingerprint)
         return True
-    except json.JSONDecodeError as e:
-        logger.error(f"Invalid JSON in configuration file {CONFIG_FILE}: {e}")
+    except json.JSONDecodeError as e:  # orjson.JSONDecodeError is a subclass
+        logger.error("Invalid JSON in configuration file %s: %s", CONFIG_FILE, e)
         return False
     except Exception as e:
-        logger.error(f"Error reading or parsing configuration file {CONFIG_FILE}: {e}")
+        logger.error("Error reading or parsing configuration file %s: %s", CONFIG_FILE, e)
+        return False
+
+@functools.lru_cache(maxsize=32)
+def is_valid_ipv4(ip):
+    """Return True if the string is an IPv4 address accepted by inet_aton (results are memoized)."""
+    try:
+        socket.inet_aton(ip)
+        return True
+    except (OSError, TypeError):
         return False
 
 def detect_host_ip():
-    """Detect the real host IP address using the detection script or fallbacks."""
+    """Detect the real host IP address using the detection module or fallbacks."""
     logger.info("Attempting to detect host IP...")
+
+    # Fast path: an address injected via `docker run -e` needs no detection at all
+    env_ip = os.environ.get('REAL_HOST_IP') or os.environ.get('EXTERNAL_HOST')
+    if env_ip and is_valid_ipv4(env_ip):
+        logger.info("Using host IP from environment: %s", env_ip)
+        # Still record it in host_info.json for other processes
+        try:
+            import detect_host_ip as detector
+            detector.write_host_info(env_ip)
+        except Exception as e:
+            logger.warning("Could not write host info file: %s", e)
+        return env_ip
+
     detected_ip = None
 
-    if HOST_DETECTOR_SCRIPT.exists():
-        logger.info(f"Running host IP detector script: {HOST_DETECTOR_SCRIPT}")
+    try:
+        import detect_host_ip as detector
+    except Exception as e:
+        logger.warning("Host IP detector module unavailable (%s). Using fallback methods.", e)
+        detector = None
+    else:
+        logger.info("Running host IP detector in-process: %s", detector.__file__)
         try:
-            result = subprocess.run(
-                [sys.executable, str(HOST_DETECTOR_SCRIPT)],
-                capture_output=True, text=True, check=False, timeout=10
-            )
-            if result.returncode == 0:
-                for line in result.stdout.splitlines():
-                    if "Detected host IP:" in line:
-                        ip = line.split("Detected host IP:")[1].strip()
-                        try:
-                            socket.inet_aton(ip) # Basic IPv4 check
-                            logger.info(f"Detected host IP via script: {ip}")
-                            detected_ip = ip
-                            break
-                        except socket.error:
-                            logger.warning(f"IP detected by script is invalid: {ip}")
-                if not detected_ip:
-                     logger.warning(f"Host IP detector script ran but did not output a valid IP. Output:\n{result.stdout}\n{result.stderr}")
+            ip = detector.find_best_host_ip()
+            detector.write_host_info(ip)
+            if is_valid_ipv4(ip):
+                logger.info("Detected host IP via detector: %s", ip)
+                detected_ip = ip
             else:
-                logger.error(f"Host IP detector script failed (exit code {result.returncode}):\n{result.stderr}")
-        except subprocess.TimeoutExpired:
-            logger.error("Host IP detector script timed out.")
+                logger.warning("IP detected by detector is invalid: %s", ip)
         except Exception as e:
-            logger.error(f"Error running host IP detector script: {e}")
-    else:
-        logger.warning(f"Host IP detector script not found at {HOST_DETECTOR_SCRIPT}. Using fallback methods.")
+            logger.error("Error running host IP detector: %s", e)
 
     # Fallback methods if script fails or doesn't exist
     if not detected_ip:
@@ -190,53 +356,38 @@ def detect_host_ip():
             # Method 1: Check REAL_HOST_IP env var (set externally, highest priority fallback)
             env_ip = os.environ.get('REAL_HOST_IP')
             if env_ip:
-                 logger.info(f"Using IP from REAL_HOST_IP environment variable: {env_ip}")
+                 logger.info("Using IP from REAL_HOST_IP environment variable: %s", env_ip)
                  return env_ip # Trust externally set IP
 
             # Method 2: Check EXTERNAL_HOST env var
             env_ip = os.environ.get('EXTERNAL_HOST')
             if env_ip:
-                try:
-                     socket.inet_aton(env_ip)
-                     logger.info(f"Using IP from EXTERNAL_HOST environment variable: {env_ip}")
+                if is_valid_ipv4(env_ip):
+                     logger.info("Using IP from EXTERNAL_HOST environment variable: %s", env_ip)
                      return env_ip
-                except socket.error:
-                     logger.warning(f"EXTERNAL_HOST value '{env_ip}' is not a valid IP. Ignoring.")
+                logger.warning("EXTERNAL_HOST value '%s' is not a valid IP. Ignoring.", env_ip)
 
             # Method 3: Try default gateway (often the host in bridge network)
-            result = subprocess.run(["ip", "route", "show", "default"], capture_output=True, text=True, check=False)
-            if result.returncode == 0:
-                parts = result.stdout.split()
-                if 'via' in parts:
-                    gateway_ip = parts[parts.index('via') + 1]
-                    try:
-                        socket.inet_aton(gateway_ip)
-                        logger.info(f"Using default gateway IP as potential host IP: {gateway_ip}")
-                        return gateway_ip
-                    except socket.error:
-                        logger.debug(f"Default gateway value '{gateway_ip}' is not a valid IP.")
-
-            # Method 4: Use `hostname -I` (may give multiple IPs)
-            result = subprocess.run(["hostname", "-I"], capture_output=True, text=True, check=False)
-            if result.returncode == 0:
-                 ips = result.stdout.strip().split()
-                 if ips:
-                      for ip in ips: # Prefer non-internal IPs if possible
-                          if not ip.startswith('172.') and not ip.startswith('127.'):
-                              try:
-                                  socket.inet_aton(ip)
-                                  logger.info(f"Using first non-internal IP from 'hostname -I': {ip}")
-                                  return ip
-                              except socket.error: continue
-                      # If only internal IPs found, return the first valid one
-                      for ip in ips:
-                           try:
-                               socket.inet_aton(ip)
-                               logger.info(f"Using first valid IP from 'hostname -I': {ip}")
-                               return ip
-                           except socket.error: continue
+            # Methods 3 and 4 reuse the detector's own probes, so they need the module
+            if detector is None:
+                raise RuntimeError("host IP detector module unavailable")
+            gateway_ip = detector.get_docker_gateway_ip()
+            if gateway_ip:
+                logger.info("Using default gateway IP as potential host IP: %s", gateway_ip)
+                return gateway_ip
+
+            # Method 4: Use the addresses the container hostname resolves to (may give multiple IPs)
+            ips = detector.get_local_ips()
+            if ips:
+                 for ip in ips: # Prefer non-internal IPs if possible
+                     if not ip.startswith('172.'):
+                         logger.info("Using first non-internal local IP: %s", ip)
+                         return ip
+                 # If only internal IPs found, return the first one
+                 logger.info("Using first local IP: %s", ips[0])
+                 return ips[0]
         except Exception as e:
-             logger.warning(f"Internal host IP detection methods failed: {e}")
+             logger.warning("Internal host IP detection methods failed: %s", e)
 
     # Final fallback if no IP found
     if not detected_ip:
@@ -252,101 +403,174 @@ def update_environment_variables(host_ip):
         return
 
     # Always set REAL_HOST_IP and EXTERNAL_HOST based on the final determined IP
-    logger.info(f"Setting container environment: REAL_HOST_IP={host_ip}, EXTERNAL_HOST={host_ip}")
+    logger.info("Setting container environment: REAL_HOST_IP=%s, EXTERNAL_HOST=%s", host_ip, host_ip)
     os.environ['REAL_HOST_IP'] = host_ip
     os.environ['EXTERNAL_HOST'] = host_ip
 
     # Optionally write to a file, though less necessary now
+    payload = (
+        f'export REAL_HOST_IP="{host_ip}"\n'
+        f'export EXTERNAL_HOST="{host_ip}"\n'
+    ).encode('utf-8')
     try:
-        env_file = Path('/tmp/mcp_environment')
-        with env_file.open('w') as f:
-            f.write(f'export REAL_HOST_IP="{host_ip}"\n')
-            f.write(f'export EXTERNAL_HOST="{host_ip}"\n')
-        logger.debug(f"Environment variables also saved to {env_file}")
+        # Build the whole file up front and emit it with a single write
+        fd = os.open(ENV_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, payload)
+        finally:
+            os.close(fd)
+        logger.debug("Environment variables also saved to %s", ENV_FILE)
     except Exception as e:
-        logger.warning(f"Failed to write environment file {env_file}: {e}")
+        logger.warning("Failed to write environment file %s: %s", ENV_FILE, e)
 
-def generate_client_configs():
-    """Generate client configurations using the dedicated script."""
-    config_generator_script = SCRIPTS_DIR / "integrate_config_generator.py"
-    logger.info(f"Attempting to generate client configurations using {config_generator_script}...")
-
-    if not config_generator_script.exists():
-        logger.error(f"Client config generator script not found.")
+def generator_fingerprint():
+    """Fingerprint the client config generator inputs: configuration contents and the host IP clients will use."""
+    try:
+        digest = hashlib.sha256(CONFIG_FILE.read_bytes()).hexdigest()
+    except OSError:
+        return None
+    return f"{digest}:{os.environ.get('REAL_HOST_IP', '')}"
+
+def client_configs_up_to_date():
+    """Return True if the client configurations were generated from the current configuration and host IP."""
+    if os.environ.get('FORCE_REGEN') == '1':
+        logger.info("FORCE_REGEN=1 set, regenerating client configurations.")
+        return False
+    try:
+        previous = GENERATOR_FINGERPRINT_FILE.read_text(encoding='utf-8').strip()
+    except OSError:
         return False
+    return previous == generator_fingerprint() and all(path.exists() for path in LATEST_CLIENT_CONFIGS)
 
+def write_generator_fingerprint():
+    """Atomically record the inputs the client configurations were just generated from."""
+    fingerprint = generator_fingerprint()
+    if not fingerprint:
+        return
+    tmp_file = GENERATOR_FINGERPRINT_FILE.with_name(GENERATOR_FINGERPRINT_FILE.name + '.tmp')
     try:
-        # Ensure output directory exists and is writable
-        if not ensure_directory(CLIENT_CONFIGS_DIR):
-             logger.error(f"Cannot generate client configs: Output directory {CLIENT_CONFIGS_DIR} is not writable.")
-             return False
+        tmp_file.write_text(fingerprint, encoding='utf-8')
+        os.replace(tmp_file, GENERATOR_FINGERPRINT_FILE)
+    except OSError as e:
+        logger.debug("Could not write generator fingerprint %s: %s", GENERATOR_FINGERPRINT_FILE, e)
 
-        # Run the config generator script
-        result = subprocess.run(
-            [sys.executable, str(config_generator_script)],
-            capture_output=True, text=True, check=False, timeout=30
-        )
+def generate_client_configs():
+    """Generate client configurations using the dedicated generator module."""
+    logger.info("Attempting to generate client configurations...")
 
-        if result.returncode != 0:
-            logger.error(f"Client configuration generator script failed (exit code {result.returncode}):\nSTDOUT:\n{result.stdout}\nSTDERR:\n{result.stderr}")
-            return False
+    if generate_all_configs is None:
+        logger.error("Client config generator module could not be imported.")
+        return False
 
-        logger.info("Client configurations generated successfully.")
-        logger.debug(f"Generator output:\n{result.stdout}")
-        return True
-    except subprocess.TimeoutExpired:
-        logger.error("Client config generator script timed out.")
+    # Ensure output directory exists and is writable
+    if not ensure_directory(CLIENT_CONFIGS_DIR):
+         logger.error("Cannot generate client configs: Output directory %s is not writable.", CLIENT_CONFIGS_DIR)
+         return False
+
+    output = io.StringIO()
+    try:
+        # The generator prints its progress; capture it so it ends up in the log like before
+        with contextlib.redirect_stdout(output):
+            result = generate_all_configs(_parsed_config)
+    except SystemExit as e:
+        # load_config() exits the interpreter on unreadable configuration
+        logger.error("Client configuration generator aborted (exit code %s):\n%s", e.code, output.getvalue())
         return False
     except Exception as e:
-        logger.error(f"Error running client config generator: {e}")
+        logger.error("Error running client config generator: %s\n%s", e, output.getvalue())
         return False
 
+    if not result:
+        logger.error("Client configuration generator failed:\n%s", output.getvalue())
+        return False
+
+    logger.info("Client configurations generated successfully.")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Generator output:\n%s", output.getvalue())
+    # Fingerprinted after generation, since the generator may rewrite corrected server paths into the config
+    write_generator_fingerprint()
+    return True
+
+def generate_client_configs_in_background():
+    """Generate client configurations in a detached child process so server startup is not delayed."""
+    if client_configs_up_to_date():
+        logger.info("Client configurations are up to date with the configuration and host IP, skipping generation.")
+        return True
+
+    if not hasattr(os, 'fork'):
+        return generate_client_configs()
+
+    # Flush buffered output so the child does not emit it a second time
+    sys.stdout.flush()
+    sys.stderr.flush()
+    try:
+        pid = os.fork()
+    except OSError as e:
+        logger.warning("Could not fork client config generator (%s). Generating synchronously.", e)
+        return generate_client_configs()
+
+    if pid == 0:
+        # Child: leave the parent's session so it can exit without waiting for us
+        exit_code = 1
+        try:
+            os.setsid()
+            exit_code = 0 if generate_client_configs() else 1
+        except BaseException as e:
+            logger.error("Background client config generation failed: %s", e)
+        finally:
+            logging.shutdown()
+            os._exit(exit_code)
+
+    logger.info("Client configuration generation continues in the background (PID: %s). Files in %s will appear once it finishes.", pid, CLIENT_CONFIGS_DIR)
+    return True
+
 # --- Main Execution ---
 
 def main():
     """Main container initialization sequence."""
-    start_time = time.time()
+    start_time = time.perf_counter()
     logger.info("--- Starting MCP Server Container Initialization ---")
 
     # 0. Log basic environment info
     uid = os.geteuid()
     gid = os.getegid()
     home = os.environ.get('HOME', '/root') # Default to /root if HOME not set
-    logger.info(f"Running initialization as UID={uid}, GID={gid}, HOME={home}")
-    logger.info(f"Current PATH: {os.environ.get('PATH', 'Not Set')}")
-
-    # 1. Ensure essential directories exist and are writable
-    logger.info("Step 1: Ensuring essential directories...")
-    dirs_ok = all([
-        ensure_directory(CONFIG_DIR),
-        ensure_directory(LOGS_DIR),
-        ensure_directory(PIDS_DIR),
-        ensure_directory(CLIENT_CONFIGS_DIR),
-        ensure_directory(MCP_DATA_DIR),
-        ensure_directory(MCP_SERVERS_DIR),
-    ])
-    if not dirs_ok:
-         logger.critical("One or more essential directories are not writable. Aborting initialization.")
-         return 1 # Exit if directories are not usable
-
-    # 2. Check for essential tools
-    logger.info("Step 2: Checking for essential tools...")
-    tools_ok = check_essential_tools()
-    if not tools_ok:
-        # Decide whether to proceed if tools are missing
-        logger.warning("Essential tool check failed. Continuing, but functionality may be impaired.")
-        # return 1 # Or exit
-
-    # 3. Check MCP server configuration file
-    logger.info("Step 3: Checking MCP server configuration...")
-    config_ok = check_mcp_config()
-    if not config_ok:
-        logger.critical("MCP server configuration check failed. Aborting initialization.")
-        return 1 # Exit if config is bad
-
-    # 4. Detect host IP
-    logger.info("Step 4: Detecting host IP...")
-    host_ip = detect_host_ip() # Handles fallbacks internally
+    logger.info("Running initialization as UID=%s, GID=%s, HOME=%s", uid, gid, home)
+    logger.info("Current PATH: %s", os.environ.get('PATH', 'Not Set'))
+
+    with ThreadPoolExecutor(max_workers=STARTUP_MAX_WORKERS) as executor:
+        # 1. Ensure essential directories exist and are writable
+        logger.info("Step 1: Ensuring essential directories...")
+        dirs_ok = all(list(executor.map(ensure_directory, ESSENTIAL_DIRS)))
+        if not dirs_ok:
+             logger.critical("One or more essential directories are not writable. Aborting initialization.")
+             return 1 # Exit if directories are not usable
+
+        # Steps 2-4 do not depend on each other, so they run concurrently
+        # 2. Check for essential tools
+        logger.info("Step 2: Checking for essential tools...")
+        tools_future = executor.submit(check_essential_tools)
+
+        # 3. Check MCP server configuration file
+        logger.info("Step 3: Checking MCP server configuration...")
+        config_future = executor.submit(check_mcp_config)
+
+        # 4. Detect host IP
+        logger.info("Step 4: Detecting host IP...")
+        host_ip_future = executor.submit(detect_host_ip) # Handles fallbacks internally
+
+        tools_ok = tools_future.result()
+        if not tools_ok:
+            # Decide whether to proceed if tools are missing
+            logger.warning("Essential tool check failed. Continuing, but functionality may be impaired.")
+            # return 1 # Or exit
+
+        config_ok = config_future.result()
+        if not config_ok:
+            logger.critical("MCP server configuration check failed. Aborting initialization.")
+            return 1 # Exit if config is bad
+
+        host_ip = host_ip_future.result()
 
     # 5. Update environment variables
     logger.info("Step 5: Updating environment variables...")
@@ -355,10 +579,10 @@ def main():
 
     # 6. Generate client configurations
     logger.info("Step 6: Generating client configurations...")
-    generate_client_configs() # Errors logged within the function
+    generate_client_configs_in_background() # Errors logged within the function
 
-    end_time = time.time()
-    logger.info(f"--- Container initialization complete ({end_time - start_time:.2f} seconds). Effective host IP for clients: {final_ip_for_clients} ---")
+    end_time = time.perf_counter()
+    logger.info("--- Container initialization complete (%.2f seconds). Effective host IP for clients: %s ---", end_time - start_time, final_ip_for_clients)
     return 0 # Indicate success to the entrypoint script
 
 if __name__ == "__main__":
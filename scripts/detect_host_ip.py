@@ -8,14 +8,20 @@ This script provides reliable methods to detect the real host IP address
 that is accessible from external clients in containerized environments.
 """
 
+import functools
 import os
 import socket
-import subprocess
+import sys
+import struct
 import logging
 import json
 import time
 from pathlib import Path
-import ipaddress
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
 
 # Configure logging
 logging.basicConfig(
@@ -24,70 +30,113 @@ logging.basicConfig(
 )
 logger = logging.getLogger('host_ip_detection')
 
-def is_valid_ip(ip):
+# Kernel routing table and the RTF_GATEWAY route flag
+PROC_NET_ROUTE = '/proc/net/route'
+RTF_GATEWAY = 0x2
+# ioctl request returning an interface's IPv4 address (linux/sockios.h)
+SIOCGIFADDR = 0x8915
+
+def parse_ipv4(ip):
     """
-    Validate if a string is a valid IP address
+    Parse a dotted IPv4 address into an integer
+    
+    Parsing once and passing the integer along lets callers validate and
+    classify an address without converting it again.
     
     Args:
-        ip (str): IP address to validate
+        ip (str): IP address to parse
         
     Returns:
-        bool: True if valid IP address
+        int: The address as an integer, or None if ip is not a valid IPv4 address
     """
     try:
-        ipaddress.ip_address(ip)
-        return True
-    except ValueError:
-        return False
+        return struct.unpack("!I", socket.inet_pton(socket.AF_INET, ip))[0]
+    except (OSError, TypeError):
+        return None
+
+# Docker commonly uses these network ranges for internal addressing, as (network, mask) integers
+DOCKER_RANGES = tuple(
+    (parse_ipv4(network), 0xFFFF0000)
+    for network in (
+        "172.17.0.0",  # Docker default bridge network
+        "172.18.0.0",  # User-defined networks often use these ranges
+        "172.19.0.0",
+        "172.20.0.0",
+        "198.18.0.0",  # Docker Desktop specific ranges
+    )
+)
+
+# Common LAN subnets in order of preference, as (network, mask, label)
+LAN_RANGES = (
+    (parse_ipv4("192.168.0.0"), 0xFFFF0000, "192.168.x.x"),  # Common home/office networks
+    (parse_ipv4("10.0.0.0"), 0xFF000000, "10.x.x.x"),  # Common for larger networks
+    (parse_ipv4("172.16.0.0"), 0xFFFF0000, "172.16.x.x"),  # Excluding Docker ranges checked above
+)
+
+@functools.lru_cache(maxsize=1)
+def get_hostname():
+    """
+    Get this machine's hostname (cached, it does not change for the life of the container)
+    
+    Returns:
+        str: Hostname
+    """
+    return socket.gethostname()
 
+@functools.lru_cache(maxsize=1)
 def get_docker_gateway_ip():
     """
     Get the Docker gateway IP address (usually host IP from container's perspective)
     
+    The default route is read straight from the kernel routing table
+    (/proc/net/route) instead of running `ip route` or `netstat`.
+    
     Returns:
         str: IP address or None if not found
     """
     try:
-        # Try to get the default gateway using route command
-        result = subprocess.run(
-            ["ip", "route", "show", "default"],
-            capture_output=True, 
-            text=True, 
-            check=False
-        )
-        
-        if result.returncode == 0:
-            # Parse the output to find the gateway IP
-            for line in result.stdout.splitlines():
-                if "default via" in line:
-                    parts = line.split()
-                    for i, part in enumerate(parts):
-                        if part == "via" and i < len(parts) - 1:
-                            gateway = parts[i+1]
-                            if is_valid_ip(gateway):
-                                return gateway
-        
-        # Alternative method using netstat
-        result = subprocess.run(
-            ["netstat", "-rn"],
-            capture_output=True, 
-            text=True, 
-            check=False
-        )
-        
-        if result.returncode == 0:
-            for line in result.stdout.splitlines():
-                if "0.0.0.0" in line or "default" in line:
-                    parts = line.split()
-                    for part in parts:
-                        if is_valid_ip(part) and not part.startswith("0.0.0.0"):
-                            return part
+        with open(PROC_NET_ROUTE, "r") as f:
+            next(f, None)  # Skip header line
+            for line in f:
+                # Iface Destination Gateway Flags ...; the default route has destination 0.0.0.0
+                fields = line.split()
+                if len(fields) < 4 or fields[1] != "00000000":
+                    continue
+                if not int(fields[3], 16) & RTF_GATEWAY:
+                    continue
+                # Gateway is a little-endian hex IPv4 address
+                gateway = socket.inet_ntoa(struct.pack("<L", int(fields[2], 16)))
+                if parse_ipv4(gateway) is not None:
+                    return gateway
                             
         return None
     except Exception as e:
-        logger.error(f"Error getting Docker gateway IP: {e}")
+        logger.error("Error getting Docker gateway IP: %s", e)
         return None
 
+def get_interface_ips():
+    """
+    Get the IPv4 address of every network interface using the SIOCGIFADDR ioctl (Linux only)
+    
+    Returns:
+        list: List of IP addresses, interfaces without an IPv4 address are skipped
+    """
+    interface_ips = []
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        for _, name in socket.if_nameindex():
+            if name == "lo":
+                continue
+            try:
+                ifreq = fcntl.ioctl(s.fileno(), SIOCGIFADDR, struct.pack("256s", name[:15].encode()))
+            except OSError:
+                continue  # No IPv4 address assigned
+            # struct ifreq: 16-byte name, then sockaddr_in whose address starts at offset 4
+            interface_ips.append(socket.inet_ntoa(ifreq[20:24]))
+    finally:
+        s.close()
+    return interface_ips
+
 def get_local_ips():
     """
     Get all non-loopback local network interface IPs
@@ -95,50 +144,42 @@ def get_local_ips():
     Returns:
         list: List of IP addresses
     """
-    local_ips = []
+    local_ips = set()
     
     try:
-        # Method 1: Using hostname lookup
-        hostname = socket.gethostname()
-        for info in socket.getaddrinfo(hostname, None):
-            ip = info[4][0]
-            if is_valid_ip(ip) and not ip.startswith("127."):
-                local_ips.append(ip)
-                
-        # Method 2: Using socket connection method
-        if not local_ips:
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            try:
-                s.connect(('10.255.255.255', 1))
-                ip = s.getsockname()[0]
-                if is_valid_ip(ip) and not ip.startswith("127."):
-                    local_ips.append(ip)
-            except:
-                pass
-            finally:
-                s.close()
-                
-        # Method 3: Using hostname -I command
+        # Method 1: Using socket connection method (no DNS/NSS lookup involved)
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         try:
-            result = subprocess.run(
-                ["hostname", "-I"],
-                capture_output=True, 
-                text=True, 
-                check=False
-            )
-            
-            if result.returncode == 0:
-                for ip in result.stdout.split():
-                    if is_valid_ip(ip) and not ip.startswith("127."):
-                        local_ips.append(ip)
+            s.connect(('10.255.255.255', 1))
+            ip = s.getsockname()[0]
+            if parse_ipv4(ip) is not None and not ip.startswith("127."):
+                local_ips.add(ip)
         except:
             pass
+        finally:
+            s.close()
         
+        # Only one external IP is needed; skip the hostname lookup once we have it
+        if any(not is_docker_internal_ip(ip) for ip in local_ips):
+            return list(local_ips)
+                
+        # Method 2: Ask the kernel for each interface address (Linux), which avoids DNS/NSS lookups
+        if fcntl is not None and sys.platform.startswith("linux"):
+            for ip in get_interface_ips():
+                if not ip.startswith("127."):
+                    local_ips.add(ip)
+        else:
+            # Method 2 elsewhere: Using hostname lookup
+            hostname = get_hostname()
+            for info in socket.getaddrinfo(hostname, None):
+                ip = info[4][0]
+                if parse_ipv4(ip) is not None and not ip.startswith("127."):
+                    local_ips.add(ip)
+                
     except Exception as e:
-        logger.error(f"Error getting local IPs: {e}")
+        logger.error("Error getting local IPs: %s", e)
     
-    # Filter duplicate IPs
-    return list(set(local_ips))
+    return list(local_ips)
 
 def check_environment_variables():
     """
@@ -149,71 +190,53 @@ def check_environment_variables():
     """
     # Check for explicit REAL_HOST_IP setting
     real_host_ip = os.environ.get('REAL_HOST_IP')
-    if real_host_ip and is_valid_ip(real_host_ip):
-        logger.info(f"Using explicitly configured REAL_HOST_IP: {real_host_ip}")
+    if real_host_ip and parse_ipv4(real_host_ip) is not None:
+        logger.info("Using explicitly configured REAL_HOST_IP: %s", real_host_ip)
         return real_host_ip
     
     # Check for EXTERNAL_HOST setting
     external_host = os.environ.get('EXTERNAL_HOST')
     if external_host:
         # If it's an IP address, use it directly
-        if is_valid_ip(external_host):
-            logger.info(f"Using EXTERNAL_HOST IP: {external_host}")
+        if parse_ipv4(external_host) is not None:
+            logger.info("Using EXTERNAL_HOST IP: %s", external_host)
             return external_host
         
         # If it's a hostname, try to resolve it
         try:
             ip = socket.gethostbyname(external_host)
-            logger.info(f"Resolved EXTERNAL_HOST {external_host} to {ip}")
+            logger.info("Resolved EXTERNAL_HOST %s to %s", external_host, ip)
             return ip
         except socket.gaierror:
-            logger.warning(f"Could not resolve EXTERNAL_HOST: {external_host}")
+            logger.warning("Could not resolve EXTERNAL_HOST: %s", external_host)
     
     return None
 
-def is_docker_internal_ip(ip):
+def is_docker_internal_ip(ip, ip_int=None):
     """
     Check if an IP is likely a Docker internal network IP
     
     Args:
         ip (str): IP address to check
+        ip_int (int): The address already parsed with parse_ipv4(), if available
         
     Returns:
         bool: True if likely Docker internal IP
     """
-    if not ip:
-        return False
-        
-    try:
-        # Docker commonly uses these network ranges for internal addressing
-        ip_obj = ipaddress.ip_address(ip)
-        
-        # Docker default bridge network
-        if ip_obj in ipaddress.ip_network('172.17.0.0/16'):
-            return True
-        
-        # User-defined networks often use these ranges
-        if ip_obj in ipaddress.ip_network('172.18.0.0/16'):
-            return True
-        if ip_obj in ipaddress.ip_network('172.19.0.0/16'):
-            return True
-        if ip_obj in ipaddress.ip_network('172.20.0.0/16'):
-            return True
-            
-        # Docker Desktop specific ranges
-        if ip_obj in ipaddress.ip_network('198.18.0.0/16'):
-            return True
-            
-        return False
-    except:
-        return False
+    if ip_int is None:
+        ip_int = parse_ipv4(ip)
+        if ip_int is None:
+            return False
+    return any(ip_int & mask == network for network, mask in DOCKER_RANGES)
 
+@functools.lru_cache(maxsize=1)
 def find_best_host_ip():
     """
     Find the best IP address for external clients to connect to the host
     
     This function tries multiple strategies to determine the most appropriate
     IP address for external clients to connect to services running in the container.
+    The result is cached per process; call find_best_host_ip.cache_clear() to re-detect.
     
     Returns:
         str: Best IP address to use
@@ -226,42 +249,34 @@ def find_best_host_ip():
     # Strategy 2: Get the Docker gateway IP (often the host's IP)
     gateway_ip = get_docker_gateway_ip()
     if gateway_ip and not is_docker_internal_ip(gateway_ip):
-        logger.info(f"Using Docker gateway IP: {gateway_ip}")
+        logger.info("Using Docker gateway IP: %s", gateway_ip)
         return gateway_ip
     
     # Strategy 3: Try to find a suitable local IP
     local_ips = get_local_ips()
     
-    # Filter out Docker internal IPs
-    external_ips = [ip for ip in local_ips if not is_docker_internal_ip(ip)]
+    # Filter out Docker internal IPs, keeping each parsed address for the subnet checks below
+    parsed_ips = [(ip, parse_ipv4(ip)) for ip in local_ips]
+    external_ips = [(ip, ip_int) for ip, ip_int in parsed_ips if not is_docker_internal_ip(ip, ip_int)]
     
     if external_ips:
         # Prefer IPs in common LAN subnets
-        for ip in external_ips:
-            ip_obj = ipaddress.ip_address(ip)
+        for ip, ip_int in external_ips:
+            if ip_int is None:
+                continue  # Not IPv4, cannot be in a preferred subnet
             
-            # 192.168.x.x range (common home/office networks)
-            if ip_obj in ipaddress.ip_network('192.168.0.0/16'):
-                logger.info(f"Using LAN IP from 192.168.x.x range: {ip}")
-                return ip
-                
-            # 10.x.x.x range (common for larger networks)
-            if ip_obj in ipaddress.ip_network('10.0.0.0/8'):
-                logger.info(f"Using LAN IP from 10.x.x.x range: {ip}")
-                return ip
-                
-            # 172.16.x.x range (excluding Docker ranges we already checked)
-            if ip_obj in ipaddress.ip_network('172.16.0.0/16'):
-                logger.info(f"Using LAN IP from 172.16.x.x range: {ip}")
-                return ip
+            for network, mask, label in LAN_RANGES:
+                if ip_int & mask == network:
+                    logger.info("Using LAN IP from %s range: %s", label, ip)
+                    return ip
         
         # If no preferred subnet, use the first external IP
-        logger.info(f"Using first available external IP: {external_ips[0]}")
-        return external_ips[0]
+        logger.info("Using first available external IP: %s", external_ips[0][0])
+        return external_ips[0][0]
     
     # Strategy 4: Fall back to environment IP even if it's a Docker internal IP
     if env_ip:
-        logger.warning(f"No suitable external IP found, using configured IP: {env_ip}")
+        logger.warning("No suitable external IP found, using configured IP: %s", env_ip)
         return env_ip
     
     # Last resort: use localhost, which isn't externally accessible
@@ -289,18 +304,24 @@ def write_host_info(ip):
         if not config_dir.exists():
             config_dir = Path.home()
         
-        # Write to JSON file
+        # Write to JSON file: serialize first, then one write to a temp file that replaces the old one
         info_file = config_dir / "host_info.json"
-        with open(info_file, "w") as f:
-            json.dump(host_info, f, indent=2)
+        payload = json.dumps(host_info, indent=2).encode("utf-8")
+        tmp_file = info_file.with_suffix(".json.tmp")
+        fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, payload)
+        finally:
+            os.close(fd)
+        os.replace(tmp_file, info_file)
         
-        logger.info(f"Host IP information written to {info_file}")
+        logger.info("Host IP information written to %s", info_file)
         
         # Also set environment variable for current process
         os.environ["DETECTED_HOST_IP"] = ip
         
     except Exception as e:
-        logger.error(f"Error writing host info: {e}")
+        logger.error("Error writing host info: %s", e)
 
 if __name__ == "__main__":
     # When run directly, find and print the best host IP
@@ -14,20 +14,23 @@ Supported formats:
 import json
 import os
 import random
+import shutil
 import string
 import time
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
 # Import functions from config.py to avoid duplication
-from mcp_manager.config import load_config, get_server_ip_port
+from mcp_manager.config import load_config, correct_server_paths, get_server_ip_port
 
 # Configuration file paths
 CONFIG_FILE = Path(__file__).parent.parent / "config" / "mcp_servers.json"
 CONFIG_OUTPUT_DIR = Path(__file__).parent.parent / "config" / "client_configs"
 
-# Ensure output directory exists
-CONFIG_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-
 # Default configurations for different clients
 CLIENT_DEFAULTS = {
     "cline": {
@@ -44,30 +47,76 @@ CLIENT_DEFAULTS = {
     }
 }
 
+# Roo Code entry for a disabled server; shared by every disabled server, treat as read-only
+ROO_CODE_DISABLED_SERVER = {
+    "disabled": True,
+    # "alwaysAllow": []
+}
+
+# Encoder used when orjson is not installed, built once instead of inside every json.dumps call
+JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, indent=2)
+
+# Cherry Studio mcp-auto-install entry, identical in every generated file; shared, treat as read-only
+CHERRY_AUTO_INSTALL_ID = "cPqOEdSHLwBLnukhxTppp"
+CHERRY_AUTO_INSTALL_SERVER = {
+    "isActive": True,
+    "name": "mcp-auto-install",
+    "description": "Automatically install MCP services (Beta version)",
+    "baseUrl": "",
+    "command": "npx",
+    "args": ["-y", "@mcpmarket/mcp-auto-install", "connect", "--json"],
+    "registryUrl": "https://registry.npmmirror.com",
+    "env": {}
+}
+
+# Characters used in Cherry Studio server IDs, and a generator private to this module for drawing them
+ID_CHARS = string.ascii_letters + string.digits
+ID_RNG = random.Random()
+
 def generate_random_id(length=20):
     """Generate random ID for Cherry Studio configuration"""
-    chars = string.ascii_letters + string.digits
-    return ''.join(random.choice(chars) for _ in range(length))
+    # One choices call instead of a random.choice per character; the ID is a UI key, not a secret
+    return ''.join(ID_RNG.choices(ID_CHARS, k=length))
 
-def generate_cline_config(servers_config):
-    """Generate Cline format configuration file"""
-    config = {"mcpServers": {}}
+def prepare_server_entries(servers_config):
+    """
+    Precompute what every client format needs from each server, in one pass over the configuration
     
+    Returns a list of dicts with the server's "name", resolved SSE "url",
+    "enabled" flag and the original "server" configuration.
+    """
+    entries = []
     for server in servers_config["servers"]:
         host, port = get_server_ip_port(server)
-        url = f"http://{host}:{port}/sse"
+        entries.append({
+            "name": server["name"],
+            "url": f"http://{host}:{port}/sse",
+            "enabled": server.get("enabled", True),
+            "server": server
+        })
+    return entries
+
+def generate_cline_config(servers_config, entries=None):
+    """Generate Cline format configuration file"""
+    config = {"mcpServers": {}}
+    
+    if entries is None:
+        entries = prepare_server_entries(servers_config)
+    
+    for entry in entries:
+        server, url = entry["server"], entry["url"]
         server_config = {
             "disabled": False,
             "timeout": 60,
             "url": url,
             "transportType": "sse"
         }
-        if not server.get("enabled", True):
+        if not entry["enabled"]:
             # If server is disabled, set disabled flag
             server_config.update({
                 "disabled": True
             })
-            config["mcpServers"][server["name"]] = server_config
+            config["mcpServers"][entry["name"]] = server_config
             continue
         
         # Add auto-approved function list from server configuration
@@ -78,26 +127,24 @@ def generate_cline_config(servers_config):
             else:
                 server_config["autoApprove"] = server["autoApprove"]
         
-        config["mcpServers"][server["name"]] = server_config
+        config["mcpServers"][entry["name"]] = server_config
     
     return config
 
-def generate_roo_code_config(servers_config):
+def generate_roo_code_config(servers_config, entries=None):
     """Generate Roo Code format configuration file"""
     config = {"mcpServers": {}}
     
-    for server in servers_config["servers"]:
-        if not server.get("enabled", True):
-            # If server is disabled, set disabled flag
-            config["mcpServers"][server["name"]] = {
-                "disabled": True,
-                # "alwaysAllow": []
-            }
+    if entries is None:
+        entries = prepare_server_entries(servers_config)
+    
+    for entry in entries:
+        server, url = entry["server"], entry["url"]
+        if not entry["enabled"]:
+            # If server is disabled, set disabled flag (the stub never varies, so it is shared)
+            config["mcpServers"][entry["name"]] = ROO_CODE_DISABLED_SERVER
             continue
         
-        host, port = get_server_ip_port(server)
-        url = f"http://{host}:{port}/sse"
-        
         server_config = {
             "url": url
         }
@@ -110,39 +157,31 @@ def generate_roo_code_config(servers_config):
             else:
                 server_config["alwaysAllow"] = server["autoApprove"]
         
-        config["mcpServers"][server["name"]] = server_config
+        config["mcpServers"][entry["name"]] = server_config
     
     return config
 
-def generate_cherry_studio_config(servers_config):
+def generate_cherry_studio_config(servers_config, entries=None):
     """Generate Cherry Studio format configuration file"""
     config = {"mcpServers": {}}
     
     # Add an mcp-auto-install entry
-    config["mcpServers"]["cPqOEdSHLwBLnukhxTppp"] = {
-        "isActive": True,
-        "name": "mcp-auto-install",
-        "description": "Automatically install MCP services (Beta version)",
-        "baseUrl": "",
-        "command": "npx",
-        "args": ["-y", "@mcpmarket/mcp-auto-install", "connect", "--json"],
-        "registryUrl": "https://registry.npmmirror.com",
-        "env": {}
-    }
+    config["mcpServers"][CHERRY_AUTO_INSTALL_ID] = CHERRY_AUTO_INSTALL_SERVER
     
-    for server in servers_config["servers"]:
+    if entries is None:
+        entries = prepare_server_entries(servers_config)
+    
+    for entry in entries:
+        server, url = entry["server"], entry["url"]
         server_id = generate_random_id()
         
         # If server is disabled, set isActive to false
-        isActive = server.get("enabled", True)
-        
-        host, port = get_server_ip_port(server)
-        url = f"http://{host}:{port}/sse"
+        isActive = entry["enabled"]
         
         server_config = {
             "isActive": isActive,
-            "name": server["name"],
-            "description": server.get("description", server["name"]),
+            "name": entry["name"],
+            "description": server.get("description", entry["name"]),
             "baseUrl": url
         }
         
@@ -150,17 +189,18 @@ def generate_cherry_studio_config(servers_config):
     
     return config
 
-def generate_github_copilot_config(servers_config):
+def generate_github_copilot_config(servers_config, entries=None):
     """Generate GitHub Copilot format configuration file"""
     config = {"mcp": {"servers": {}}}
     
-    for server in servers_config["servers"]:
-        if not server.get("enabled", True):
+    if entries is None:
+        entries = prepare_server_entries(servers_config)
+    
+    for entry in entries:
+        server, url = entry["server"], entry["url"]
+        if not entry["enabled"]:
             continue
         
-        host, port = get_server_ip_port(server)
-        url = f"http://{host}:{port}/sse"
-        
         # Get server type from config, default to "sse" if not specified
         server_type = server.get("transport_type", "sse")
         
@@ -178,45 +218,136 @@ def generate_github_copilot_config(servers_config):
         #     else:
         #         server_config["autoApprove"] = server["autoApprove"]
         
-        config["mcp"]["servers"][server["name"]] = server_config
+        config["mcp"]["servers"][entry["name"]] = server_config
     
     return config
 
-def save_config_to_file(config, filename):
-    """Save configuration to file"""
+def encode_config(config):
+    """Serialize a configuration to indented UTF-8 JSON bytes"""
+    if orjson is not None:
+        # OPT_NON_STR_KEYS stringifies non-str keys like the json module does instead of raising
+        return orjson.dumps(config, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return JSON_ENCODER.encode(config).encode("utf-8")
+
+def output_dir_fd():
+    """
+    Open CONFIG_OUTPUT_DIR once so the save helpers can resolve names relative to it
+    
+    Returns:
+        int: Directory file descriptor, or None where the platform lacks dir_fd support
+    """
+    needed = {os.open, os.stat, os.unlink, os.link, os.rename}
+    if not hasattr(os, "O_DIRECTORY") or not needed <= os.supports_dir_fd:
+        return None
+    return os.open(CONFIG_OUTPUT_DIR, os.O_RDONLY | os.O_DIRECTORY)
+
+def output_path(filename, dir_fd=None):
+    """Name to pass to os functions: relative to dir_fd when it is open, otherwise the full path"""
+    return filename if dir_fd is not None else str(CONFIG_OUTPUT_DIR / filename)
+
+def save_config_to_file(config, filename, dir_fd=None):
+    """Save configuration (a dict, or bytes from encode_config) to file, relative to dir_fd if given"""
     file_path = CONFIG_OUTPUT_DIR / filename
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(config, f, ensure_ascii=False, indent=2)
+    if not isinstance(config, bytes):
+        config = encode_config(config)
+    # Write the whole file at once to a temporary name, then swap it in so clients never read a partial file
+    tmp_name = output_path(filename + ".tmp", dir_fd)
+    fd = os.open(tmp_name, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644, dir_fd=dir_fd)
+    try:
+        os.write(fd, config)
+    finally:
+        os.close(fd)
+    os.replace(tmp_name, output_path(filename, dir_fd), src_dir_fd=dir_fd, dst_dir_fd=dir_fd)
     return file_path
 
-def generate_all_configs():
-    """Generate all client configuration files"""
+def read_output_file(filename, size, dir_fd=None):
+    """Read up to size bytes of an output file, relative to dir_fd if given"""
+    fd = os.open(output_path(filename, dir_fd), os.O_RDONLY, dir_fd=dir_fd)
+    try:
+        return os.read(fd, size)
+    finally:
+        os.close(fd)
+
+def save_latest_config(source_path, filename, payload=None, dir_fd=None):
+    """
+    Make the latest configuration file a hard link to source_path, falling back to a copy
+    
+    If payload (the bytes of source_path) is given and the latest file already
+    holds exactly those bytes, it is left untouched. With dir_fd, both files
+    are looked up relative to that open CONFIG_OUTPUT_DIR descriptor.
+    """
+    latest_path = CONFIG_OUTPUT_DIR / filename
+    latest_name = output_path(filename, dir_fd)
+    if payload is not None:
+        try:
+            # Size first, so a changed configuration rarely needs the file read at all
+            if (os.stat(latest_name, dir_fd=dir_fd).st_size == len(payload)
+                    and read_output_file(filename, len(payload) + 1, dir_fd) == payload):
+                return latest_path
+        except OSError:
+            pass
+    tmp_name = output_path(filename + ".tmp", dir_fd)
+    try:
+        # Link under a temporary name, then swap it in so readers never see the file missing
+        try:
+            os.unlink(tmp_name, dir_fd=dir_fd)
+        except FileNotFoundError:
+            pass
+        os.link(output_path(Path(source_path).name, dir_fd), tmp_name, src_dir_fd=dir_fd, dst_dir_fd=dir_fd)
+        os.replace(tmp_name, latest_name, src_dir_fd=dir_fd, dst_dir_fd=dir_fd)
+    except OSError:
+        # File system without hard links: copy the file (in-kernel via sendfile on Linux) instead
+        tmp_path = latest_path.with_name(latest_path.name + ".tmp")
+        shutil.copyfile(source_path, tmp_path)
+        os.replace(tmp_path, latest_path)
+    return latest_path
+
+def generate_all_configs(servers_config=None):
+    """Generate all client configuration files
+    
+    servers_config may be a configuration the caller has already parsed
+    (e.g. by container_startup.py); otherwise it is loaded from disk.
+    """
     # Load server configuration
-    servers_config = load_config()
+    if servers_config is None:
+        servers_config = load_config()
+    else:
+        servers_config = correct_server_paths(servers_config)
     if not servers_config:
         print("Failed to load server configuration")
         return None
     
-    # Generate different format configurations
-    cline_config = generate_cline_config(servers_config)
-    roo_code_config = generate_roo_code_config(servers_config)
-    cherry_studio_config = generate_cherry_studio_config(servers_config)
-    github_copilot_config = generate_github_copilot_config(servers_config)
+    # Ensure output directory exists
+    CONFIG_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    
+    # Generate different format configurations, each serialized once for both of its files
+    # Server addresses and flags are worked out once here rather than once per server in every format
+    entries = prepare_server_entries(servers_config)
+    cline_config = encode_config(generate_cline_config(servers_config, entries))
+    roo_code_config = encode_config(generate_roo_code_config(servers_config, entries))
+    cherry_studio_config = encode_config(generate_cherry_studio_config(servers_config, entries))
+    github_copilot_config = encode_config(generate_github_copilot_config(servers_config, entries))
     
     # Generate filenames with timestamp
     timestamp = time.strftime("%Y%m%d%H%M%S")
     
-    # Save configuration files
-    cline_path = save_config_to_file(cline_config, f"mcp_cline_{timestamp}.json")
-    roo_code_path = save_config_to_file(roo_code_config, f"mcp_roo_code_{timestamp}.json")
-    cherry_studio_path = save_config_to_file(cherry_studio_config, f"mcp_cherry_studio_{timestamp}.json")
-    github_copilot_path = save_config_to_file(github_copilot_config, f"mcp_github_copilot_{timestamp}.json")
-    
-    # Also save a copy of the latest configuration (without timestamp)
-    latest_cline_path = save_config_to_file(cline_config, "mcp_cline_latest.json")
-    latest_roo_code_path = save_config_to_file(roo_code_config, "mcp_roo_code_latest.json")
-    latest_cherry_studio_path = save_config_to_file(cherry_studio_config, "mcp_cherry_studio_latest.json")
-    latest_github_copilot_path = save_config_to_file(github_copilot_config, "mcp_github_copilot_latest.json")
+    # Resolve the output directory once; every file below is opened relative to it
+    dir_fd = output_dir_fd()
+    try:
+        # Save configuration files
+        cline_path = save_config_to_file(cline_config, f"mcp_cline_{timestamp}.json", dir_fd)
+        roo_code_path = save_config_to_file(roo_code_config, f"mcp_roo_code_{timestamp}.json", dir_fd)
+        cherry_studio_path = save_config_to_file(cherry_studio_config, f"mcp_cherry_studio_{timestamp}.json", dir_fd)
+        github_copilot_path = save_config_to_file(github_copilot_config, f"mcp_github_copilot_{timestamp}.json", dir_fd)
+        
+        # Also provide the latest configuration (without timestamp), linked to the files just written unless unchanged
+        latest_cline_path = save_latest_config(cline_path, "mcp_cline_latest.json", cline_config, dir_fd)
+        latest_roo_code_path = save_latest_config(roo_code_path, "mcp_roo_code_latest.json", roo_code_config, dir_fd)
+        latest_cherry_studio_path = save_latest_config(cherry_studio_path, "mcp_cherry_studio_latest.json", cherry_studio_config, dir_fd)
+        latest_github_copilot_path = save_latest_config(github_copilot_path, "mcp_github_copilot_latest.json", github_copilot_config, dir_fd)
+    finally:
+        if dir_fd is not None:
+            os.close(dir_fd)
     
     return {
         "cline": str(cline_path),
@@ -2,17 +2,22 @@
 
 # -*- coding: utf-8 -*-
 
-import json
 import os
 import platform
+import re
+import select
+import shlex
+import shutil
 import signal
 import subprocess
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import psutil
-from mcp_manager.config import get_server_ip_port
+from mcp_manager.config import get_server_ip_port, read_config
 # Configuration file paths
 CONFIG_FILE = Path(__file__).parent.parent / "config" / "mcp_servers.json"
 PID_DIR = Path(__file__).parent.parent / "pids"
@@ -23,10 +28,33 @@ PID_DIR.mkdir(exist_ok=True)
 LOG_DIR.mkdir(exist_ok=True)
 
 
-# Load configuration
+# Print one line at a time; servers are started and stopped from several threads at once
+_print_lock = threading.Lock()
+
+
+def safe_print(*args, **kwargs):
+    with _print_lock:
+        print(*args, **kwargs)
+
+
+# Load configuration as is (no path correction); cached by mcp_manager.config while the file is unchanged,
+# so callers share the returned dictionary and should not modify it
 def load_config():
-    with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return read_config(CONFIG_FILE)
+
+
+# Name index of the last configuration searched, as (config, {name: server})
+_server_index = (None, {})
+
+
+# Find a server's configuration by name (None if there is no such server)
+def find_server(name):
+    global _server_index
+    config = load_config()
+    if _server_index[0] is not config:
+        # Rebuilt only when the configuration was re-parsed; the first entry wins for duplicate names
+        _server_index = (config, {server["name"]: server for server in reversed(config["servers"])})
+    return _server_index[1].get(name)
 
 
 # Save PID to file
@@ -37,11 +65,26 @@ def save_pid(name, pid):
 
 # Load PID from file
 def load_pid(name):
-    pid_file = PID_DIR / f"{name}.pid"
-    if pid_file.exists():
-        with open(pid_file, "r") as f:
+    try:
+        with open(PID_DIR / f"{name}.pid", "r") as f:
             return int(f.read().strip())
-    return None
+    except FileNotFoundError:
+        return None
+
+
+# Load every PID file with a single directory scan, as {name: pid}
+def load_all_pids():
+    pid_map = {}
+    with os.scandir(PID_DIR) as entries:
+        for entry in entries:
+            if not entry.name.endswith(".pid"):
+                continue
+            try:
+                with open(entry.path, "r") as f:
+                    pid_map[entry.name[:-4]] = int(f.read().strip())
+            except (OSError, ValueError):
+                continue  # Removed meanwhile, or not a PID file we wrote
+    return pid_map
 
 
 # Remove PID file
@@ -53,40 +96,139 @@ def remove_pid_file(name):
 
 # Check if process is running
 def is_running(pid):
+    if platform.system() != "Windows":
+        # Signal 0 only checks that the pid exists: a single kill(2), nothing read from /proc
+        try:
+            os.kill(pid, 0)
+            return True
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True  # Exists, but belongs to another user
+    # On Windows os.kill terminates the process, so ask psutil instead
     try:
         return psutil.pid_exists(pid)
     except psutil.NoSuchProcess:  # Be specific about expected errors
         # PID does not exist, which means it's not running
         return False
     except Exception as e:  # Catch other potential errors during check
-        print(f"Error checking PID {pid}: {e}")
+        safe_print(f"Error checking PID {pid}: {e}")
         return False  # Assume not running if error occurs
 
 
-# Check if port is in use
-def is_port_in_use(port):
-    for conn in psutil.net_connections():
-        if conn.laddr.port == port:
-            return conn.pid
-    return None
+# Wait up to timeout seconds for a process to exit, return True if it did
+def wait_for_exit(pid, timeout):
+    # Linux 5.3+: a pidfd becomes readable the moment the process exits, no polling needed
+    if hasattr(os, "pidfd_open"):
+        try:
+            fd = os.pidfd_open(pid)
+        except ProcessLookupError:
+            return True
+        except OSError:
+            fd = None  # Kernel without pidfd support
+        if fd is not None:
+            try:
+                return bool(select.select([fd], [], [], timeout)[0])
+            finally:
+                os.close(fd)
+    deadline = time.monotonic() + timeout
+    while not has_exited(pid):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(0.1, remaining))
+    return True
+
+
+# Check if a process has exited; an exited child of ours is reaped, and a zombie counts as exited
+def has_exited(pid):
+    if hasattr(os, "WNOHANG"):
+        try:
+            if os.waitpid(pid, os.WNOHANG)[0] == pid:
+                return True
+        except ChildProcessError:
+            pass  # Not our child, so we cannot reap it
+    if not is_running(pid):
+        return True
+    try:
+        # kill(pid, 0) succeeds on a zombie that its parent has not reaped yet
+        return psutil.Process(pid).status() == psutil.STATUS_ZOMBIE
+    except psutil.NoSuchProcess:
+        return True
+    except psutil.Error:
+        return False
+
+
+# Map each local port to the process using it, from a single scan of the connection table
+def snapshot_port_map():
+    port_map = {}
+    for conn in psutil.net_connections(kind="inet"):
+        if conn.laddr:
+            port_map.setdefault(conn.laddr.port, conn.pid)
+    return port_map
+
 
+# Check if port is in use (port_map: a snapshot_port_map() result to reuse across several checks)
+def is_port_in_use(port, port_map=None):
+    if port_map is None:
+        port_map = snapshot_port_map()
+    return port_map.get(port)
 
-# Start server
-def start_server(server):
+
+# {key} placeholder in command templates
+PLACEHOLDER_PATTERN = re.compile(r"\{([^{}]+)\}")
+
+
+# Fill {key} placeholders from values in a single pass over the template; unknown ones are left as they are
+def fill_placeholders(template, values):
+    return PLACEHOLDER_PATTERN.sub(lambda match: values.get(match.group(1), match.group(0)), template)
+
+
+# Characters that need /bin/sh to interpret them (newlines separate commands)
+SHELL_SYNTAX = frozenset("$`|&;<>()\n")
+# Glob characters, expanded by the shell unless quoted
+GLOB_CHARS = frozenset("*?[")
+# Quoted strings, removed before looking for glob characters
+QUOTED_PATTERN = re.compile(r"'[^']*'|\"[^\"]*\"")
+# Leading VAR=value assignment, which the shell applies to the command's environment
+ENV_ASSIGNMENT_PATTERN = re.compile(r"[A-Za-z_]\w*=")
+# Shell builtins, which have no executable to run directly
+SHELL_BUILTINS = frozenset(("cd", "export", "source", ".", "exec", "eval", "set", "unset", "ulimit", "umask"))
+
+
+# Split a command into an argv list, or return None if it must run through the shell
+def command_argv(cmd):
+    # Windows resolves npx/uvx wrapper scripts through the shell, so always use it there
+    if platform.system() == "Windows" or not SHELL_SYNTAX.isdisjoint(cmd):
+        return None
+    if not GLOB_CHARS.isdisjoint(QUOTED_PATTERN.sub("", cmd)):
+        return None
+    try:
+        argv = shlex.split(cmd)
+    except ValueError:  # Unbalanced quotes: leave it to the shell to report
+        return None
+    if not argv or argv[0] in SHELL_BUILTINS or ENV_ASSIGNMENT_PATTERN.match(argv[0]):
+        return None
+    # Expand ~ the way the shell would (e.g. the filesystem server's root directory)
+    return [os.path.expanduser(arg) if arg.startswith("~") else arg for arg in argv]
+
+
+# Start server, return its subprocess.Popen (None if it was not started)
+def start_server(server, port_map=None):
     name = server["name"]
 
     # Check if already running
     pid = load_pid(name)
     if pid and is_running(pid):
-        print(f"Server '{name}' is already running (PID: {pid})")
+        safe_print(f"Server '{name}' is already running (PID: {pid})")
         return
 
     # Check if port is already in use
     port = server.get("sse_port", server.get("port"))
     if port:
-        existing_pid = is_port_in_use(port)
+        existing_pid = is_port_in_use(port, port_map)
         if existing_pid:
-            print(f"Warning: Port {port} is already in use by process {existing_pid}")
+            safe_print(f"Warning: Port {port} is already in use by process {existing_pid}")
 
     # Prepare environment variables
     env = os.environ.copy()
@@ -94,76 +236,93 @@ def start_server(server):
         env[key] = value
 
     # Prepare start command
+    extra_args = []
     if "sse_host" in server and "sse_port" in server:
-        print(f"Starting server '{name}' (SSE mode)")
+        safe_print(f"Starting server '{name}' (SSE mode)")
         # SSE mode
-        cmd = server["sse_start_command"]
-        # Replace placeholders in command
-        for key, value in server.items():
-            # Always try to replace, and convert value to string to ensure compatibility
-            cmd = cmd.replace("{" + key + "}", str(value))
-        # Replace environment variable placeholders
+        # Replace placeholders in command (including {start_command}), converting values to strings
+        cmd = fill_placeholders(server["sse_start_command"], {key: str(value) for key, value in server.items()})
+        # Pass environment variables on as -e KEY VALUE arguments
         for key, value in server.get("env", {}).items():
             # cmd = cmd.replace("{" + key + "}", value)
-            cmd += f" -e {key} {value}"
-        # Replace start command
-        start_cmd = server["start_command"]
-        cmd = cmd.replace("{start_command}", start_cmd)
+            extra_args += ["-e", key, str(value)]
     else:
         # Non-SSE mode
         cmd = server["start_command"]
         if "port" in server:
             cmd = cmd.replace("{port}", str(server["port"]))
 
-    # Create log file
-    log_file = open(LOG_DIR / f"{name}_{time.strftime('%Y%m%d%H%M%S')}.log", "a")
+    # Run the command directly when it needs no shell features, saving a /bin/sh process per server
+    argv = command_argv(cmd)
+    if extra_args:
+        if argv is not None:
+            argv += extra_args
+        cmd += "".join(f" {shlex.quote(arg)}" for arg in extra_args)
+
+    # Create log file; only the server keeps it open, our descriptor is closed once it has been handed over
+    log_fd = os.open(
+        LOG_DIR / f"{name}_{time.strftime('%Y%m%d%H%M%S')}.log", os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644
+    )
 
-    # Add log header information
-    log_file.write(f"=== Service Start {time.ctime()} ===\n")
-    log_file.write(f"Execute command: {cmd}\n\n")
+    # Add log header information, written before the server can add anything
+    os.write(log_fd, f"=== Service Start {time.ctime()} ===\nExecute command: {cmd}\n\n".encode("utf-8"))
 
     # Print startup information for debugging
-    print(f"Starting server '{name}' with command: {cmd}")
+    safe_print(f"Starting server '{name}' with command: {cmd}")
 
     # Start server
     try:
-        # Bandit B602: shell=True is a security risk if cmd contains untrusted input.
-        print(f"Start command: {cmd}")
-
-        process = subprocess.Popen(cmd, shell=True, env=env, stdout=log_file, stderr=log_file)
+        # Bandit B602: shell=True is a security risk if cmd contains untrusted input, so it is only used when needed.
+        safe_print(f"Start command: {cmd}")
+
+        # Given an absolute executable and close_fds=False, subprocess spawns with posix_spawn
+        # (no fork of this process); descriptors we open are non-inheritable, so none leak
+        executable = shutil.which(argv[0], path=env.get("PATH")) if argv is not None else None
+        if argv is not None and executable is None:
+            # The shell may still find it (e.g. on a PATH set in its startup files), and reports the error if not
+            safe_print(f"'{argv[0]}' not found on PATH, starting server '{name}' through the shell")
+            argv = None
+        if argv is not None:
+            process = subprocess.Popen(
+                argv, executable=executable, env=env, stdout=log_fd, stderr=log_fd, close_fds=False
+            )
+        else:
+            process = subprocess.Popen(cmd, shell=True, env=env, stdout=log_fd, stderr=log_fd)
         save_pid(name, process.pid)
-        print(f"Server '{name}' started (PID: {process.pid})")
+        safe_print(f"Server '{name}' started (PID: {process.pid})")
+        return process
     except Exception as e:
-        print(f"Failed to start server '{name}': {e}")
+        safe_print(f"Failed to start server '{name}': {e}")
+    finally:
+        os.close(log_fd)
 
 
 # Stop server
-def stop_server(server):
+def stop_server(server, port_map=None):
     name = server["name"]
     pid = load_pid(name)
 
     # Check if started by our script
     if pid and is_running(pid):
+        # Remove the PID file before the process exits, so a running daemon sees the stop as intended, not a crash
+        remove_pid_file(name)
         try:
             # On Windows, use taskkill to kill process tree
             if platform.system() == "Windows":
                 subprocess.run(["taskkill", "/F", "/T", "/PID", str(pid)], check=False)
             else:
                 os.kill(pid, signal.SIGTERM)
-                # Give process some time to exit normally
-                time.sleep(1)
-                if is_running(pid):
+                # Give process up to a second to exit normally
+                if not wait_for_exit(pid, 1):
                     os.kill(pid, signal.SIGKILL)
-            print(f"Server '{name}' stopped (PID: {pid})")
+            safe_print(f"Server '{name}' stopped (PID: {pid})")
         except Exception as e:
-            print(f"Failed to stop server '{name}': {e}")
-        finally:
-            remove_pid_file(name)
+            safe_print(f"Failed to stop server '{name}': {e}")
     else:
         # Check if port is in use, try to kill the process using it
         port = server.get("sse_port", server.get("port"))
         if port:
-            port_pid = is_port_in_use(port)
+            port_pid = is_port_in_use(port, port_map)
             if port_pid:
                 try:
                     # On Windows, use taskkill to kill process tree
@@ -171,17 +330,16 @@ def stop_server(server):
                         subprocess.run(["taskkill", "/F", "/T", "/PID", str(port_pid)], check=False)
                     else:
                         os.kill(port_pid, signal.SIGTERM)
-                        # Give process some time to exit normally
-                        time.sleep(1)
-                        if is_running(port_pid):
+                        # Give process up to a second to exit normally
+                        if not wait_for_exit(port_pid, 1):
                             os.kill(port_pid, signal.SIGKILL)
-                    print(f"Stopped server '{name}' running on port {port} (PID: {port_pid})")
+                    safe_print(f"Stopped server '{name}' running on port {port} (PID: {port_pid})")
                 except Exception as e:
-                    print(f"Failed to stop process on port {port}: {e}")
+                    safe_print(f"Failed to stop process on port {port}: {e}")
             else:
-                print(f"Server '{name}' is not running.")
+                safe_print(f"Server '{name}' is not running.")
         else:
-            print(f"Server '{name}' is not running under this script instance.")
+            safe_print(f"Server '{name}' is not running under this script instance.")
 
 
 # Restart server
@@ -191,8 +349,8 @@ def restart_server(server):
     start_server(server)
 
 
-# Check server status
-def server_status(server):
+# Check server status (pid_map: a load_all_pids() result to use instead of reading the PID file)
+def server_status(server, port_map=None, pid_map=None):
     name = server["name"]
     enabled = server.get("enabled", True)
     server_type = server.get("type", "unknown")
@@ -206,13 +364,13 @@ def server_status(server):
     url = f"http://{resolved_host}:{port}/sse"
 
     # Check PID file
-    pid = load_pid(name)
+    pid = load_pid(name) if pid_map is None else pid_map.get(name)
     pid_running = pid and is_running(pid)
 
     # Check port
     port_pid = None
     if port != "N/A":
-        port_pid = is_port_in_use(port)
+        port_pid = is_port_in_use(port, port_map)
 
     # Determine status
     if not enabled:
@@ -246,77 +404,184 @@ def server_status(server):
 # Get status of all servers
 def get_all_status():
     config = load_config()
+    # One connection table scan and one PID directory scan shared by every server
+    port_map = snapshot_port_map()
+    pid_map = load_all_pids()
     status_list = []
     for server in config["servers"]:
-        status_list.append(server_status(server))
+        status_list.append(server_status(server, port_map, pid_map))
     return status_list
 
 
+# Status table row: Name, Enabled, Type, Port, Status, PID (This Instance), Path
+STATUS_ROW = "{:<20} {:<10} {:<15} {:<10} {:<30} {:<20} {:<70}\n"
+
+
 # Display status table
 def print_status_table():
     status_list = get_all_status()
 
-    # Print header
-    print("\n--- MCP Server Status ---")
-    headers = ["Name", "Enabled", "Type", "Port", "Status", "PID (This Instance)", "Path"]
-    col_widths = [20, 10, 15, 10, 30, 20, 70]
-
-    print(
-        "{:<{}} {:<{}} {:<{}} {:<{}} {:<{}} {:<{}} {:<{}}".format(
-            headers[0],
-            col_widths[0],
-            headers[1],
-            col_widths[1],
-            headers[2],
-            col_widths[2],
-            headers[3],
-            col_widths[3],
-            headers[4],
-            col_widths[4],
-            headers[5],
-            col_widths[5],
-            headers[6],
-            col_widths[6],
-        )
-    )
-
-    print("-" * 100)
+    # Build the whole table, then write it out at once
+    lines = [
+        "\n--- MCP Server Status ---\n",
+        STATUS_ROW.format("Name", "Enabled", "Type", "Port", "Status", "PID (This Instance)", "Path"),
+        "-" * 100 + "\n",
+    ]
 
-    # Print status for each server
+    # Add status for each server
     for status in status_list:
-        print(
-            "{:<{}} {:<{}} {:<{}} {:<{}} {:<{}} {:<{}} {:<{}}".format(
+        lines.append(
+            STATUS_ROW.format(
                 status["name"],
-                col_widths[0],
                 str(status["enabled"]),
-                col_widths[1],
                 status["type"],
-                col_widths[2],
                 status["port"],
-                col_widths[3],
                 status["status"],
-                col_widths[4],
                 status["pid"],
-                col_widths[5],
                 status["url"],
-                col_widths[6],
             )
         )
 
+    sys.stdout.write("".join(lines))
 
-# Start all enabled servers
-def start_all_servers():
-    config = load_config()
-    for server in config["servers"]:
-        if server.get("enabled", True):
-            start_server(server)
+
+# Run func for each server concurrently, return the results in server order;
+# launches and shutdowns are independent of each other
+def run_for_servers(func, servers, *args):
+    if not servers:
+        return []
+    with ThreadPoolExecutor(max_workers=min(32, len(servers))) as executor:
+        # list() waits for every server and re-raises anything unexpected
+        return list(executor.map(lambda server: func(server, *args), servers))
+
+
+# Start all enabled servers, return (server, process) for each one started here
+def start_all_servers(config=None):
+    if config is None:
+        config = load_config()
+    servers = [server for server in config["servers"] if server.get("enabled", True)]
+    # One connection table scan shared by every server's port check
+    processes = run_for_servers(start_server, servers, snapshot_port_map())
+    return [(server, process) for server, process in zip(servers, processes) if process is not None]
 
 
 # Stop all servers
-def stop_all_servers():
-    config = load_config()
-    for server in config["servers"]:
-        stop_server(server)
+def stop_all_servers(config=None):
+    if config is None:
+        config = load_config()
+    # One connection table scan shared by every server that has to be found by its port
+    run_for_servers(stop_server, config["servers"], snapshot_port_map())
+
+
+# Seconds between full health checks (process alive and port listening) in daemon mode
+HEALTH_CHECK_INTERVAL = 30
+
+
+# Get a file descriptor that becomes readable whenever a child process exits (None without SIGCHLD, i.e. Windows)
+def watch_child_exits():
+    if not hasattr(signal, "SIGCHLD"):
+        return None
+    read_fd, write_fd = os.pipe()
+    os.set_blocking(read_fd, False)
+    os.set_blocking(write_fd, False)
+    signal.set_wakeup_fd(write_fd)
+    # The handler has nothing to do: the byte written to the wakeup fd is what wakes the daemon loop
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+    return read_fd
+
+
+# Empty a non-blocking pipe
+def drain_fd(fd):
+    try:
+        while os.read(fd, 512):
+            pass
+    except BlockingIOError:
+        pass
+
+
+# Restart a server from the daemon and keep its process, so the daemon notices when it exits;
+# restart_times records when each server was last restarted
+def start_child(server, children, restart_times, port_map=None):
+    restart_times[server["name"]] = time.monotonic()
+    process = start_server(server, port_map)
+    if process is not None:
+        children[process.pid] = (server, process)
+
+
+# Collect children that have exited and restart the servers that died on their own;
+# return the names of the servers restarted
+def restart_exited_children(children, restart_times):
+    restarted = set()
+    for pid, (server, process) in list(children.items()):
+        # poll() reaps this one process; the Popen objects are held here, so subprocess never reaps them behind our back
+        if process.poll() is None:
+            continue
+        del children[pid]
+        # If the PID file no longer names this process, it was stopped or restarted on purpose (e.g. manage_mcp.py stop)
+        if load_pid(server["name"]) != pid:
+            continue
+        # A server that crashes again soon after a restart is left to the periodic health check,
+        # so one that keeps failing is restarted at most once per interval
+        last_restart = restart_times.get(server["name"])
+        if last_restart is not None and time.monotonic() - last_restart < HEALTH_CHECK_INTERVAL:
+            continue
+        safe_print(f"Service '{server['name']}' abnormally stopped, restarting...")
+        start_child(server, children, restart_times)
+        restarted.add(server["name"])
+    return restarted
+
+
+# Keep the process running: restart servers as soon as their process exits, and check ports periodically
+def run_daemon(config, started):
+    # Processes this daemon started, {pid: (server, process)}
+    children = {process.pid: (server, process) for server, process in started}
+    # When each server was last restarted, {name: time.monotonic()}
+    restart_times = {}
+    wakeup_fd = watch_child_exits()
+    next_check = time.monotonic() + HEALTH_CHECK_INTERVAL
+    try:
+        while True:
+            # Restart servers whose process has exited (on the first pass, any that died before the watch began)
+            restart_exited_children(children, restart_times)
+
+            # Sleep until a child exits or the next health check is due
+            timeout = next_check - time.monotonic()
+            if timeout > 0:
+                if wakeup_fd is None:
+                    time.sleep(timeout)
+                elif select.select([wakeup_fd], [], [], timeout)[0]:
+                    drain_fd(wakeup_fd)
+                    continue
+                if time.monotonic() < next_check:
+                    continue
+            next_check = time.monotonic() + HEALTH_CHECK_INTERVAL
+
+            # Collect exits again right before checking: a server that has just exited would pass kill(pid, 0) as a
+            # zombie, and one restarted a moment ago has not had time to open its port, so it is skipped
+            restarted = restart_exited_children(children, restart_times)
+
+            # Added health check logic, with one connection table and PID directory scan per tick
+            port_map = snapshot_port_map()
+            pid_map = load_all_pids()
+            for server in config["servers"]:
+                if server.get("enabled", True) and server["name"] not in restarted:
+                    pid = pid_map.get(server["name"])
+                    port = server.get("sse_port", server.get("port"))
+
+                    # Double check: process exists and port is listening
+                    if pid and is_running(pid) and port:
+                        if not is_port_in_use(port, port_map):
+                            print(f"Service '{server['name']}' process exists but port {port} is not listening, restarting...")
+                            # Forget the process first so its exit is not taken for a crash
+                            children.pop(pid, None)
+                            stop_server(server, port_map)
+                            start_child(server, children, restart_times, port_map)
+                    elif pid and not is_running(pid):
+                        print(f"Service '{server['name']}' abnormally stopped, restarting...")
+                        start_child(server, children, restart_times, port_map)
+    except KeyboardInterrupt:
+        print("Daemon mode interrupted, stopping all servers...")
+        stop_all_servers(config)
 
 
 # Main function
@@ -337,67 +602,22 @@ def main():
 
     if command == "start" and not server_name:
         # Start all enabled servers
-        start_all_servers()
+        started = start_all_servers(config)
         # Check if running in daemon mode (Docker container)
         if os.environ.get("MCP_DAEMON_MODE", "false").lower() == "true":
             print("Running in daemon mode, keeping process alive...")
-            try:
-                # Keep the process running and periodically check server status
-                while True:
-                    time.sleep(30)  # Reduced check interval to 30 seconds
-
-                    # Added health check logic
-                    for server in config["servers"]:
-                        if server.get("enabled", True):
-                            pid = load_pid(server["name"])
-                            port = server.get("sse_port", server.get("port"))
-
-                            # Double check: process exists and port is listening
-                            if pid and is_running(pid) and port:
-                                if not is_port_in_use(port):
-                                    print(f"Service '{server['name']}' process exists but port {port} is not listening, restarting...")
-                                    stop_server(server)
-                                    start_server(server)
-                            elif pid and not is_running(pid):
-                                print(f"Service '{server['name']}' abnormally stopped, restarting...")
-                                start_server(server)
-            except KeyboardInterrupt:
-                print("Daemon mode interrupted, stopping all servers...")
-                stop_all_servers()
+            run_daemon(config, started)
         return
 
     if command == "daemon":
         # Explicit daemon mode command
         print("Starting all servers in daemon mode...")
-        start_all_servers()
-        try:
-            # Keep the process running and periodically check server status
-            while True:
-                time.sleep(30)  # Reduced check interval to 30 seconds
-
-                # Added health check logic
-                for server in config["servers"]:
-                    if server.get("enabled", True):
-                        pid = load_pid(server["name"])
-                        port = server.get("sse_port", server.get("port"))
-
-                        # Double check: process exists and port is listening
-                        if pid and is_running(pid) and port:
-                            if not is_port_in_use(port):
-                                print(f"Service '{server['name']}' process exists but port {port} is not listening, restarting...")
-                                stop_server(server)
-                                start_server(server)
-                        elif pid and not is_running(pid):
-                            print(f"Service '{server['name']}' abnormally stopped, restarting...")
-                            start_server(server)
-        except KeyboardInterrupt:
-            print("Daemon mode interrupted, stopping all servers...")
-            stop_all_servers()
+        run_daemon(config, start_all_servers(config))
         return
 
     if command == "stop" and not server_name:
         # Stop all servers
-        stop_all_servers()
+        stop_all_servers(config)
         return
 
     if not server_name:
@@ -405,11 +625,7 @@ def main():
         return
 
     # Find server configuration
-    server = None
-    for s in config["servers"]:
-        if s["name"] == server_name:
-            server = s
-            break
+    server = find_server(server_name)
 
     if not server:
         print(f"Server '{server_name}' not found")
@@ -3,9 +3,17 @@
 This module provides functionality for loading and saving MCP server configurations.
 """
 
+import copy
+import functools
 import json
 import os
 import sys
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    orjson = None
 
 # --- Constants ---
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
@@ -16,11 +24,32 @@ SOURCE_CODE_SERVERS_DIR = os.path.join(BASE_DIR, "mcp-servers")
 # --- Helper Functions ---
 
 
+@functools.lru_cache(maxsize=4)
+def _parse_config_file(path, mtime_ns, size):
+    """Parse a configuration file; cached per (path, mtime, size) so an unchanged file is parsed once"""
+    # Parse straight from bytes: one read, and both parsers take UTF-8 bytes directly
+    data = Path(path).read_bytes()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def read_config(path=CONFIG_FILE):
+    """Parse a configuration file as is, without correcting server paths
+
+    The result is cached while the file's mtime and size are unchanged, so
+    callers share the returned dictionary and should not modify it.
+    """
+    st = os.stat(path)
+    return _parse_config_file(os.fspath(path), st.st_mtime_ns, st.st_size)
+
+
 def load_config():
-    """Load server configuration and automatically correct paths"""
+    """Load server configuration and automatically correct paths
+
+    The file is only parsed again when it changes; each call gets its own copy
+    of the cached result, which it is free to modify.
+    """
     try:
-        with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-            config = json.load(f)
+        config = read_config(CONFIG_FILE)
     except FileNotFoundError:
         print(f"Error: Configuration file not found at {CONFIG_FILE}")
         sys.exit(1)
@@ -28,6 +57,13 @@ def load_config():
         print(f"Error: Configuration file {CONFIG_FILE} is not valid JSON.")
         sys.exit(1)
 
+    # Path corrections must not leak into the cache: if saving them fails, the unchanged
+    # file would otherwise keep serving corrections that were never written
+    return correct_server_paths(copy.deepcopy(config))
+
+
+def correct_server_paths(config):
+    """Correct source_code server paths in an already loaded configuration, saving it if anything changed"""
     updated = False
     for server in config.get("servers", []):
         # Only process paths for source_code type servers
@@ -69,15 +105,60 @@ def load_config():
 
 
 def save_config(config):
-    """Save server configuration"""
+    """Save server configuration
+
+    The file is written under a temporary name and then swapped in, so a
+    process reading it concurrently (e.g. manage_mcp.py while client configs
+    are generated in the background) never sees a partial file.
+    """
+    tmp_file = CONFIG_FILE + ".tmp"
     try:
-        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
+        with open(tmp_file, "w", encoding="utf-8") as f:
             json.dump(config, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, CONFIG_FILE)
         print(f"Configuration updated and saved to {CONFIG_FILE}")
     except IOError:
         print(f"Error: Cannot write to configuration file {CONFIG_FILE}")
 
 
+@functools.lru_cache(maxsize=1)
+def detect_external_host():
+    """
+    Guess an externally reachable address for this machine when no host is configured
+    
+    The result is cached: it needs DNS lookups and a socket probe, and would
+    otherwise be repeated for every server with sse_host 0.0.0.0.
+    
+    Returns:
+        str: Host name or IP address
+    """
+    import socket
+    
+    # Try common Docker host names if no environment variables are set
+    host = socket.gethostbyname(socket.gethostname())
+    # Try to get the machine's actual IP address
+    try:
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        s.connect(("8.8.8.8", 80))
+        host = s.getsockname()[0]
+        s.close()
+    except:
+        pass
+    docker_hosts = ["host.docker.internal", "host.lima.internal"]
+    for docker_host in docker_hosts:
+        try:
+            socket.gethostbyname(docker_host)
+            host = docker_host
+            break
+        except socket.gaierror:
+            continue
+            
+    # If no Docker host is resolvable, fall back to localhost
+    if host == "0.0.0.0":
+        host = "localhost"
+    return host
+
+
 def get_server_ip_port(server_config):
     """
     Extract IP and port from server configuration
@@ -97,11 +178,7 @@ def get_server_ip_port(server_config):
     
     # If sse_host is 0.0.0.0, we need to return a host that is accessible from outside
     if host == "0.0.0.0":
-        # Try to get the external host from environment variables
-        import os
-        import socket
-        
-        # Try to get the real host IP first (highest priority)
+        # Try to get the external host from environment variables, real host IP first (highest priority)
         real_host_ip = os.environ.get("REAL_HOST_IP")
         if real_host_ip:
             host = real_host_ip
@@ -113,28 +190,7 @@ def get_server_ip_port(server_config):
                 # Use the configured external host
                 host = external_host
             else:
-                # Try common Docker host names if no environment variables are set
-                host = socket.gethostbyname(socket.gethostname())
-                # Try to get the machine's actual IP address
-                try:
-                    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                    s.connect(("8.8.8.8", 80))
-                    host = s.getsockname()[0]
-                    s.close()
-                except:
-                    pass
-                docker_hosts = ["host.docker.internal", "host.lima.internal"]
-                for docker_host in docker_hosts:
-                    try:
-                        socket.gethostbyname(docker_host)
-                        host = docker_host
-                        break
-                    except socket.gaierror:
-                        continue
-                        
-                # If no Docker host is resolvable, fall back to localhost
-                if host == "0.0.0.0":
-                    host = "localhost"
+                host = detect_external_host()
     
     port = server_config.get("sse_port", 23001)
     return host, port
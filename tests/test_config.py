@@ -0,0 +1,50 @@
+"""Tests for the configuration cache in mcp_manager.config"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from mcp_manager import config  # noqa: E402
+
+
+class LoadConfigCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.config_file = os.path.join(self.tmp_dir.name, "mcp_servers.json")
+        with open(self.config_file, "w", encoding="utf-8") as f:
+            json.dump({"servers": [{"name": "web", "start_command": "web --port {port}", "port": 23001}]}, f)
+        patcher = mock.patch.object(config, "CONFIG_FILE", self.config_file)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        config._parse_config_file.cache_clear()
+        self.addCleanup(config._parse_config_file.cache_clear)
+
+    def test_mutating_loaded_config_does_not_change_cache(self):
+        loaded = config.load_config()
+        loaded["servers"][0]["port"] = 9999
+        loaded["servers"].append({"name": "extra"})
+
+        cached = config.read_config(self.config_file)
+        self.assertEqual(cached["servers"], [{"name": "web", "start_command": "web --port {port}", "port": 23001}])
+        self.assertEqual(config.load_config()["servers"][0]["port"], 23001)
+
+    def test_unsaved_path_correction_does_not_reach_cache(self):
+        with open(self.config_file, "w", encoding="utf-8") as f:
+            json.dump({"servers": [{"name": "src", "type": "source_code", "repo": "x/repo.git", "subdir": "."}]}, f)
+
+        # Saving fails, so the file keeps the uncorrected entry
+        with mock.patch.object(config, "save_config"), mock.patch("builtins.print"):
+            corrected = config.load_config()
+
+        self.assertIn("path", corrected["servers"][0])
+        self.assertNotIn("path", config.read_config(self.config_file)["servers"][0])
+
+
+if __name__ == "__main__":
+    unittest.main()